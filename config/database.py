@@ -1,9 +1,11 @@
 """
 Database configuration and session management for SQLite.
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import QueuePool
+import atexit
 import os
 
 # Database file path
@@ -13,19 +15,112 @@ DB_PATH = os.path.join(DB_DIR, "stories.db")
 # Ensure database directory exists
 os.makedirs(DB_DIR, exist_ok=True)
 
-# Create SQLite engine
-# Using StaticPool for SQLite to avoid threading issues
+# Create SQLite engines
+# Under WAL, many readers can run concurrently with a single writer, so we
+# split into two engines: one writer connection (BEGIN IMMEDIATE grabs the
+# write lock up front, avoiding SQLITE_BUSY on upgrade) and a pool of
+# read-only connections sized to the machine.
 DATABASE_URL = f"sqlite:///{DB_PATH}"
+READONLY_URL = f"sqlite:///file:{DB_PATH}?mode=ro&uri=true"
 
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
+    connect_args={
+        "check_same_thread": False,
+        "isolation_level": "IMMEDIATE",
+    },
+    poolclass=QueuePool,
+    pool_size=1,
+    max_overflow=0,
     echo=False  # Set to True for SQL query logging
 )
 
-# Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+read_engine = create_engine(
+    READONLY_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=QueuePool,
+    pool_size=os.cpu_count() or 4,
+    echo=False
+)
+
+# Async engines for the asyncio workflow (aiosqlite driver), mirroring the
+# writer/reader split above. The sync engines stay for DDL (init_db),
+# maintenance (optimize_db) and any synchronous tooling.
+ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{DB_PATH}"
+ASYNC_READONLY_URL = f"sqlite+aiosqlite:///file:{DB_PATH}?mode=ro&uri=true"
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args={"isolation_level": "IMMEDIATE"},
+    pool_size=1,
+    max_overflow=0,
+    echo=False
+)
+
+async_read_engine = create_async_engine(
+    ASYNC_READONLY_URL,
+    pool_size=os.cpu_count() or 4,
+    echo=False
+)
+
+# PRAGMAs applied to every new SQLite connection.
+# WAL + synchronous=NORMAL lets readers run alongside the writer and skips
+# the per-commit fsync, which dominates the many small commits made while
+# saving a story. The rest tune cache/temp/mmap sizes and enable FK checks.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA foreign_keys=ON",
+)
+
+# Read-only connections cannot change the journal mode, so skip the
+# write-side PRAGMAs for them.
+SQLITE_READONLY_PRAGMAS = (
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA foreign_keys=ON",
+)
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_conn, connection_record):
+    """Apply performance PRAGMAs on each new writer connection."""
+    cursor = dbapi_conn.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+@event.listens_for(read_engine, "connect")
+def _set_sqlite_readonly_pragmas(dbapi_conn, connection_record):
+    """Apply performance PRAGMAs on each new reader connection."""
+    cursor = dbapi_conn.cursor()
+    for pragma in SQLITE_READONLY_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+# The async engines wrap sync engines internally; register the same
+# PRAGMA listeners there.
+event.listens_for(async_engine.sync_engine, "connect")(_set_sqlite_pragmas)
+event.listens_for(async_read_engine.sync_engine, "connect")(_set_sqlite_readonly_pragmas)
+
+# Session factories
+# WriteSession goes through the single-writer engine; ReadSession checks
+# out from the read-only pool. SessionLocal stays as an alias for the
+# writer so existing call sites keep working.
+WriteSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSession = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+SessionLocal = WriteSession
+
+# Async session factories for the event-loop code paths.
+# expire_on_commit=False keeps committed objects readable without
+# triggering implicit IO after the transaction ends.
+AsyncWriteSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSession = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
 
 # Base class for ORM models
 class Base(DeclarativeBase):
@@ -44,12 +139,132 @@ def get_db():
     finally:
         db.close()
 
+def _enum_case_sql(column, enum_class):
+    """CASE expression mapping stored enum member names to int codes."""
+    whens = " ".join(
+        f"WHEN '{member.name}' THEN {code}"
+        for code, member in enumerate(enum_class)
+    )
+    return f"CASE {column} {whens} ELSE {column} END"
+
+def _migrate_schema():
+    """Upgrade databases written by older schema revisions in place.
+
+    create_all only adds missing tables — it never alters existing ones.
+    Two changes since the original schema therefore need hand-applied
+    migrations: the enum columns moved from VARCHAR member names to
+    integer codes, and stories.cache_key plus the covering indexes were
+    added. The enum change needs a table rebuild, because SQLite's text
+    affinity on the old columns would coerce integer codes back to
+    text. Everything here is idempotent, so running it on a current
+    database is a no-op.
+
+    Uses a plain sqlite3 connection: foreign keys are off by default
+    there, which the drop-and-rename rebuild requires.
+    """
+    import sqlite3
+    from src.models.database import StoryStatusEnum, AssetTypeEnum
+
+    con = sqlite3.connect(DB_PATH)
+    try:
+        cur = con.cursor()
+        story_cols = {
+            row[1]: row[2] for row in cur.execute("PRAGMA table_info(stories)")
+        }
+
+        if "cache_key" not in story_cols:
+            cur.execute("ALTER TABLE stories ADD COLUMN cache_key VARCHAR(64)")
+
+        # VARCHAR enum columns (no INT in the declared type) mean the
+        # table predates the integer-code change: rebuild it
+        if "INT" not in story_cols.get("status", "INT").upper():
+            cur.executescript(f"""
+                CREATE TABLE stories_migrate (
+                    id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+                    story_id VARCHAR(255) NOT NULL,
+                    title VARCHAR(500) NOT NULL,
+                    topic VARCHAR(500) NOT NULL,
+                    age_group FLOAT NOT NULL,
+                    status SMALLINT NOT NULL,
+                    total_pages INTEGER,
+                    cache_key VARCHAR(64),
+                    cover_image_path VARCHAR(1000),
+                    created_at DATETIME NOT NULL,
+                    updated_at DATETIME NOT NULL,
+                    UNIQUE (story_id)
+                );
+                INSERT INTO stories_migrate
+                    SELECT id, story_id, title, topic, age_group,
+                           {_enum_case_sql('status', StoryStatusEnum)},
+                           total_pages, cache_key, cover_image_path,
+                           created_at, updated_at
+                    FROM stories;
+                DROP TABLE stories;
+                ALTER TABLE stories_migrate RENAME TO stories;
+            """)
+
+        asset_cols = {
+            row[1]: row[2] for row in cur.execute("PRAGMA table_info(assets)")
+        }
+        if "INT" not in asset_cols.get("asset_type", "INT").upper():
+            cur.executescript(f"""
+                CREATE TABLE assets_migrate (
+                    id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+                    page_id INTEGER NOT NULL,
+                    asset_type SMALLINT NOT NULL,
+                    file_path VARCHAR(1000) NOT NULL,
+                    cloud_url VARCHAR(2000),
+                    size_bytes INTEGER,
+                    created_at DATETIME NOT NULL,
+                    FOREIGN KEY(page_id) REFERENCES pages (id)
+                );
+                INSERT INTO assets_migrate
+                    SELECT id, page_id,
+                           {_enum_case_sql('asset_type', AssetTypeEnum)},
+                           file_path, cloud_url, size_bytes, created_at
+                    FROM assets;
+                DROP TABLE assets;
+                ALTER TABLE assets_migrate RENAME TO assets;
+            """)
+
+        # Indexes added after the original schema (and dropped with any
+        # rebuilt table); IF NOT EXISTS keeps this safe everywhere else
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS ix_stories_cache_key ON stories (cache_key)")
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS ix_stories_created_at ON stories (created_at DESC)")
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS ix_pages_story_page ON pages (story_id, page_number)")
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS ix_assets_page_id ON assets (page_id)")
+
+        con.commit()
+    finally:
+        con.close()
+
 def init_db():
     """Initialize database tables."""
     from src.models.database import StoryDB, PageDB, AssetDB
     Base.metadata.create_all(bind=engine)
+    _migrate_schema()
     print(f"✓ Database initialized at: {DB_PATH}")
 
+def optimize_db():
+    """
+    Run PRAGMA optimize so the query planner's statistics keep up with
+    table growth. Cheap (analyzes only what changed); call it before
+    shutdown and optionally on a schedule for long-lived processes.
+    """
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA optimize")
+    except Exception:
+        # Best-effort maintenance; never fail shutdown over it
+        pass
+
+# Also run on interpreter exit in case callers forget
+atexit.register(optimize_db)
+
 def reset_db():
     """Drop all tables and recreate them. USE WITH CAUTION!"""
     Base.metadata.drop_all(bind=engine)
@@ -2,9 +2,10 @@ import asyncio
 import os
 from dotenv import load_dotenv
 from src.workflows.story_flow import StoryFlow
-from config.database import init_db, SessionLocal
+from config.database import init_db, optimize_db, AsyncReadSession
 from src.repositories.story_repository import StoryRepository
 from src.models.database import StoryStatusEnum
+from src.utils.logging_setup import setup_logging
 
 load_dotenv()
 api_key = os.getenv("GOOGLE_API_KEY")
@@ -29,11 +30,11 @@ async def generate_story(flow):
 
 async def view_stories():
     """View all stories from database."""
-    db = SessionLocal()
+    db = AsyncReadSession()
     repo = StoryRepository(db)
     
     try:
-        stories = repo.get_all_stories(limit=20)
+        stories = await repo.list_stories_summary(limit=20)
         if not stories:
             print("\nNo stories found in database.")
             return
@@ -49,16 +50,16 @@ async def view_stories():
             print(f"   Created: {story.created_at.strftime('%Y-%m-%d %H:%M:%S')}")
         print("="*80)
     finally:
-        db.close()
+        await db.close()
 
 async def view_story_details():
     """View detailed information about a specific story."""
     story_id = input("Enter the Story ID: ")
-    db = SessionLocal()
+    db = AsyncReadSession()
     repo = StoryRepository(db)
     
     try:
-        db_story = repo.get_story(story_id)
+        db_story = await repo.get_story(story_id)
         if not db_story:
             print(f"\n⚠ Story '{story_id}' not found.")
             return
@@ -90,9 +91,13 @@ async def view_story_details():
         
         print("="*80)
     finally:
-        db.close()
+        await db.close()
 
 async def main():
+    # Workflow progress goes through logging; the listener thread does
+    # the stdout writes so coroutines never block on them
+    setup_logging()
+
     print("="*80)
     print("KIDS STORY AND IMAGE GENERATOR")
     print("Agentic Workflow with Database Persistence")
@@ -107,6 +112,9 @@ async def main():
     init_db()
     
     flow = StoryFlow(api_key, use_db=True)
+    # Establish the Gemini HTTPS connection now so the first story
+    # doesn't pay the TLS handshake
+    await flow.warmup()
 
     while True:
         print("\n" + "-"*80)
@@ -130,6 +138,7 @@ async def main():
             await view_story_details()
         
         elif choice == '4':
+            optimize_db()
             print("\nExiting. Goodbye!")
             break
         
@@ -1,6 +1,20 @@
 from google.adk.agents import Agent
+from pydantic import BaseModel
 from typing import List, Dict
-import json
+import logging
+import orjson
+
+logger = logging.getLogger(__name__)
+
+class PageSchema(BaseModel):
+    """Schema for a single structured page."""
+    page_number: int
+    text: str
+    illustration_prompt: str
+
+class PagesSchema(BaseModel):
+    """Schema for the editor's structured response."""
+    pages: List[PageSchema]
 
 class EditorAgent:
     """
@@ -11,10 +25,34 @@ class EditorAgent:
     4. Ensuring age-appropriate pacing and content
     """
     
+    # Static instruction block, kept byte-identical across calls and
+    # placed before any dynamic content so the provider's prompt cache
+    # can reuse the shared prefix. Worded to be self-contained: the age
+    # and story always follow below it.
+    STATIC_PROMPT_PREFIX = """Please structure the story at the end of this message into 4-8 pages appropriate for the child's age given below.
+
+Output Format (JSON):
+{
+  "pages": [
+    {
+      "page_number": 1,
+      "text": "Page text here...",
+      "illustration_prompt": "A detailed description for the illustrator..."
+    }
+  ]
+}
+
+CRITICAL: Output ONLY valid JSON, no other text or explanation."""
+
     def __init__(self, model_name="gemini-2.5-flash-lite"):
         self.model_name = model_name
         self.agent = self._build_agent()
 
+    def build_prompt(self, story_text: str, age: float) -> str:
+        """Assemble the structuring prompt: static instructions first,
+        dynamic age and story last."""
+        return f"{self.STATIC_PROMPT_PREFIX}\n\nChild's age: {age}\n\nStory:\n{story_text}"
+
     def _build_agent(self):
         """Build the editor agent that structures stories into pages."""
         editor_agent = Agent(
@@ -48,26 +86,19 @@ Output Format: Return ONLY valid JSON with this structure:
 }
 
 CRITICAL: Output ONLY valid JSON, no other text or explanation.""",
+            # Constrained decoding: the model can only emit JSON matching
+            # this schema, so no markdown fences or repair pass are needed
+            output_schema=PagesSchema,
         )
         return editor_agent
 
     def parse_structured_pages(self, json_output: str) -> List[Dict]:
-        """Parse the JSON output from the editor agent."""
+        """Parse the guaranteed-JSON output from the editor agent."""
         try:
-            # Clean up potential markdown code blocks
-            cleaned = json_output.strip()
-            if cleaned.startswith("```json"):
-                cleaned = cleaned[7:]
-            if cleaned.startswith("```"):
-                cleaned = cleaned[3:]
-            if cleaned.endswith("```"):
-                cleaned = cleaned[:-3]
-            cleaned = cleaned.strip()
-            
-            data = json.loads(cleaned)
+            data = orjson.loads(json_output)
             return data.get("pages", [])
-        except json.JSONDecodeError as e:
-            print(f"Error parsing JSON from editor agent: {e}")
-            print(f"Raw output: {json_output}")
+        except orjson.JSONDecodeError as e:
+            logger.warning("Error parsing JSON from editor agent: %s", e)
+            logger.warning("Raw output: %s", json_output)
             # Fallback: return empty list
             return []
@@ -1,25 +1,43 @@
 from google import genai
 from google.genai import types
-from src.utils.file_io import save_image
+from src.utils.file_io import save_bytes, save_image
+import asyncio
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 class IllustratorAgent:
-    def __init__(self, api_key):
-        self.client = genai.Client(api_key=api_key)
+    def __init__(self, client: genai.Client):
+        # Shared client: one HTTP connection pool across all agents
+        self.client = client
 
     def generate_image(self, prompt: str, output_path: str):
-        print(f"Generating image for prompt: {prompt}")
+        """Generate an image for the prompt. Returns (path, size_bytes),
+        or (None, None) if the model produced no image."""
+        logger.info("Generating image for prompt: %s", prompt)
         response = self.client.models.generate_content(
             model="gemini-2.5-flash-image",
             contents=prompt,
         )
-        
+
         for part in response.parts:
             if part.inline_data is not None:
-                image = part.as_image()
-                save_image(image, output_path)
-                return output_path
+                # The model ships the image already encoded; when it's
+                # the format we want, write the bytes straight through
+                # instead of PIL-decoding and re-encoding them
+                if (part.inline_data.mime_type == "image/png"
+                        and output_path.endswith(".png")):
+                    size_bytes = save_bytes(part.inline_data.data, output_path)
+                else:
+                    image = part.as_image()
+                    size_bytes = save_image(image, output_path)
+                return output_path, size_bytes
             elif part.text is not None:
                  # Handle case where model refuses or returns text
-                 print(f"Model returned text instead of image: {part.text}")
-        return None
+                 logger.warning("Model returned text instead of image: %s", part.text)
+        return None, None
+
+    async def agenerate_image(self, prompt: str, output_path: str):
+        """Async wrapper: run the blocking Gemini call in a worker thread."""
+        return await asyncio.to_thread(self.generate_image, prompt, output_path)
@@ -1,14 +1,21 @@
 from google import genai
 from google.genai import types
 from src.utils.file_io import save_wave_file
+import asyncio
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 class NarratorAgent:
-    def __init__(self, api_key):
-        self.client = genai.Client(api_key=api_key)
+    def __init__(self, client: genai.Client):
+        # Shared client: one HTTP connection pool across all agents
+        self.client = client
 
     def generate_audio(self, text: str, output_path: str):
-        print(f"Generating audio for text: {text[:50]}...")
+        """Generate narration for the text. Returns (path, size_bytes),
+        or (None, None) if the model produced no audio."""
+        logger.info("Generating audio for text: %.50s...", text)
         response = self.client.models.generate_content(
             model="gemini-2.5-flash-preview-tts",
             contents=[text],
@@ -26,6 +33,10 @@ class NarratorAgent:
         # Check if we have candidates and content
         if response.candidates and response.candidates[0].content.parts:
              data = response.candidates[0].content.parts[0].inline_data.data
-             save_wave_file(output_path, data)
-             return output_path
-        return None
+             size_bytes = save_wave_file(output_path, data)
+             return output_path, size_bytes
+        return None, None
+
+    async def agenerate_audio(self, text: str, output_path: str):
+        """Async wrapper: run the blocking Gemini call in a worker thread."""
+        return await asyncio.to_thread(self.generate_audio, text, output_path)
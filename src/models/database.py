@@ -2,9 +2,9 @@
 SQLAlchemy ORM models for database persistence.
 Maps to SQLite database tables.
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, SmallInteger, String, Float, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
-from datetime import datetime
+from sqlalchemy.types import TypeDecorator
 from config.database import Base
 import enum
 
@@ -22,6 +22,31 @@ class AssetTypeEnum(enum.Enum):
     AUDIO = "audio"
     COVER = "cover"
 
+class IntEnum(TypeDecorator):
+    """
+    Stores an enum as a small integer code instead of a VARCHAR of its value.
+    Smaller rows and a dict lookup on load instead of string parsing.
+    Codes follow definition order, so only append new members.
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_class, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._enum_class = enum_class
+        self._to_code = {member: code for code, member in enumerate(enum_class)}
+        self._from_code = {code: member for code, member in enumerate(enum_class)}
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return self._to_code[value]
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self._from_code[value]
+
 class StoryDB(Base):
     """
     Story table - stores story metadata.
@@ -29,18 +54,32 @@ class StoryDB(Base):
     __tablename__ = "stories"
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    story_id = Column(String(255), unique=True, index=True, nullable=False)
+    # unique=True already creates an index; a second explicit one would be redundant
+    story_id = Column(String(255), unique=True, nullable=False)
     title = Column(String(500), nullable=False)
     topic = Column(String(500), nullable=False)
     age_group = Column(Float, nullable=False)
-    status = Column(SQLEnum(StoryStatusEnum), default=StoryStatusEnum.DRAFT, nullable=False)
+    status = Column(IntEnum(StoryStatusEnum), default=StoryStatusEnum.DRAFT, nullable=False)
     total_pages = Column(Integer, default=0)
+    # SHA-256 of the normalized (topic, age) request; lets the workflow
+    # reuse a completed story instead of regenerating it
+    cache_key = Column(String(64), index=True, nullable=True)
     cover_image_path = Column(String(1000), nullable=True)
-    created_at = Column(DateTime, default=datetime.now, nullable=False)
-    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, nullable=False)
-    
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    # Supports get_all_stories' ORDER BY created_at DESC
+    __table_args__ = (
+        Index("ix_stories_created_at", created_at.desc()),
+    )
+
     # Relationships
-    pages = relationship("PageDB", back_populates="story", cascade="all, delete-orphan")
+    pages = relationship(
+        "PageDB",
+        back_populates="story",
+        cascade="all, delete-orphan",
+        order_by="PageDB.page_number",
+    )
     
     def __repr__(self):
         return f"<Story(id={self.id}, story_id='{self.story_id}', title='{self.title}')>"
@@ -56,8 +95,13 @@ class PageDB(Base):
     page_number = Column(Integer, nullable=False)
     text = Column(String(5000), nullable=False)
     image_prompt = Column(String(2000), nullable=True)
-    created_at = Column(DateTime, default=datetime.now, nullable=False)
-    
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+
+    # Supports get_pages' filter on story_id + ORDER BY page_number
+    __table_args__ = (
+        Index("ix_pages_story_page", "story_id", "page_number"),
+    )
+
     # Relationships
     story = relationship("StoryDB", back_populates="pages")
     assets = relationship("AssetDB", back_populates="page", cascade="all, delete-orphan")
@@ -73,12 +117,17 @@ class AssetDB(Base):
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     page_id = Column(Integer, ForeignKey("pages.id"), nullable=False)
-    asset_type = Column(SQLEnum(AssetTypeEnum), nullable=False)
+    asset_type = Column(IntEnum(AssetTypeEnum), nullable=False)
     file_path = Column(String(1000), nullable=False)
     cloud_url = Column(String(2000), nullable=True)  # For future cloud storage
     size_bytes = Column(Integer, nullable=True)
-    created_at = Column(DateTime, default=datetime.now, nullable=False)
-    
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+
+    # Supports the per-page asset lookup / eager load
+    __table_args__ = (
+        Index("ix_assets_page_id", "page_id"),
+    )
+
     # Relationships
     page = relationship("PageDB", back_populates="assets")
     
@@ -2,6 +2,13 @@ from dataclasses import dataclass, field
 from typing import List, Optional
 from datetime import datetime
 from enum import Enum
+import orjson
+
+def _json_default(obj):
+    """orjson fallback for types it doesn't handle natively."""
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
 
 class StoryStatus(Enum):
     """Status of story generation."""
@@ -11,20 +18,24 @@ class StoryStatus(Enum):
     FAILED = "failed"
     ARCHIVED = "archived"
 
-@dataclass
+@dataclass(slots=True)
 class Page:
     page_number: int
     text: str
     image_prompt: Optional[str] = None
     image_path: Optional[str] = None
     audio_path: Optional[str] = None
+    # Byte counts reported by the file writers, so persistence doesn't
+    # have to stat the files again
+    image_size_bytes: Optional[int] = None
+    audio_size_bytes: Optional[int] = None
     created_at: Optional[datetime] = None
     
     def __post_init__(self):
         if self.created_at is None:
             self.created_at = datetime.now()
 
-@dataclass
+@dataclass(slots=True)
 class Story:
     title: str
     topic: str
@@ -36,6 +47,7 @@ class Story:
     updated_at: Optional[datetime] = None
     story_id: Optional[str] = None  # Unique identifier
     total_pages: int = 0
+    cache_key: Optional[str] = None  # Request-level cache key (topic + age)
     
     def __post_init__(self):
         if self.created_at is None:
@@ -69,28 +81,15 @@ class Story:
         self.status = StoryStatus.FAILED
         self.updated_at = datetime.now()
     
+    def to_json_bytes(self) -> bytes:
+        """Serialize the story straight to JSON bytes.
+
+        orjson walks the dataclass tree and formats datetimes in C, so
+        this skips the Python-level dict building entirely.
+        """
+        return orjson.dumps(self, default=_json_default, option=orjson.OPT_NAIVE_UTC)
+
     def to_dict(self):
         """Convert story to dictionary for serialization."""
-        return {
-            "story_id": self.story_id,
-            "title": self.title,
-            "topic": self.topic,
-            "age_group": self.age_group,
-            "status": self.status.value,
-            "total_pages": self.total_pages,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-            "cover_image_path": self.cover_image_path,
-            "pages": [
-                {
-                    "page_number": p.page_number,
-                    "text": p.text,
-                    "image_prompt": p.image_prompt,
-                    "image_path": p.image_path,
-                    "audio_path": p.audio_path,
-                    "created_at": p.created_at.isoformat() if p.created_at else None
-                }
-                for p in self.pages
-            ]
-        }
+        return orjson.loads(self.to_json_bytes())
 
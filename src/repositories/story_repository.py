@@ -3,19 +3,48 @@ Repository layer for Story database operations.
 Implements CRUD operations and business logic for story persistence.
 """
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from src.models.database import StoryDB, PageDB, AssetDB, StoryStatusEnum, AssetTypeEnum
 from src.models.story import Story, Page, StoryStatus
+from collections import OrderedDict
 from datetime import datetime
 import os
 
+# Bounded LRU of converted Story dataclasses keyed by story_id.
+# Repeat views of the same story skip the DB round-trip and object
+# rebuild; write paths invalidate the entry.
+_STORY_CACHE: "OrderedDict[str, Story]" = OrderedDict()
+_STORY_CACHE_MAXSIZE = 128
+
+# Dataclass status <-> database enum, built once at import
+_STATUS_TO_DB = {
+    StoryStatus.DRAFT: StoryStatusEnum.DRAFT,
+    StoryStatus.GENERATING: StoryStatusEnum.GENERATING,
+    StoryStatus.COMPLETED: StoryStatusEnum.COMPLETED,
+    StoryStatus.FAILED: StoryStatusEnum.FAILED,
+    StoryStatus.ARCHIVED: StoryStatusEnum.ARCHIVED,
+}
+_STATUS_FROM_DB = {db: dc for dc, db in _STATUS_TO_DB.items()}
+
+def _cache_invalidate(story_id: str):
+    _STORY_CACHE.pop(story_id, None)
+
 class StoryRepository:
     """Repository for Story-related database operations."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, read_db: Optional[AsyncSession] = None):
+        """
+        Args:
+            db: Write session (bound to the single-writer engine)
+            read_db: Optional read session (bound to the read-only pool).
+                Falls back to the write session when not provided.
+        """
         self.db = db
+        self.read_db = read_db or db
     
-    def create_story(self, story: Story) -> StoryDB:
+    async def create_story(self, story: Story) -> StoryDB:
         """
         Create a new story in the database.
         
@@ -25,34 +54,16 @@ class StoryRepository:
         Returns:
             StoryDB: Created database record
         """
-        # Map dataclass status to enum
-        status_map = {
-            StoryStatus.DRAFT: StoryStatusEnum.DRAFT,
-            StoryStatus.GENERATING: StoryStatusEnum.GENERATING,
-            StoryStatus.COMPLETED: StoryStatusEnum.COMPLETED,
-            StoryStatus.FAILED: StoryStatusEnum.FAILED,
-            StoryStatus.ARCHIVED: StoryStatusEnum.ARCHIVED,
-        }
-        
-        db_story = StoryDB(
-            story_id=story.story_id,
-            title=story.title,
-            topic=story.topic,
-            age_group=story.age_group,
-            status=status_map.get(story.status, StoryStatusEnum.DRAFT),
-            total_pages=len(story.pages),
-            cover_image_path=story.cover_image_path,
-            created_at=story.created_at or datetime.now(),
-            updated_at=story.updated_at or datetime.now()
-        )
-        
+        db_story = self._build_story(story, datetime.now())
+
+        # SQLAlchemy populates db_story.id at flush (RETURNING on
+        # SQLite >= 3.35), so no post-commit refresh round-trip is needed
         self.db.add(db_story)
-        self.db.commit()
-        self.db.refresh(db_story)
-        
+        await self.db.commit()
+
         return db_story
     
-    def save_page(self, story_id: str, page: Page) -> PageDB:
+    async def save_page(self, story_id: str, page: Page) -> PageDB:
         """
         Save a page to the database.
         
@@ -63,57 +74,38 @@ class StoryRepository:
         Returns:
             PageDB: Created page record
         """
-        db_page = PageDB(
-            story_id=story_id,
-            page_number=page.page_number,
-            text=page.text,
-            image_prompt=page.image_prompt,
-            created_at=page.created_at or datetime.now()
-        )
-        
+        db_page = self._build_page(story_id, page, datetime.now())
+
         self.db.add(db_page)
-        self.db.commit()
-        self.db.refresh(db_page)
-        
-        # Save assets if they exist
-        if page.image_path:
-            self.save_asset(db_page.id, AssetTypeEnum.IMAGE, page.image_path)
-        if page.audio_path:
-            self.save_asset(db_page.id, AssetTypeEnum.AUDIO, page.audio_path)
-        
+        await self.db.commit()
+        _cache_invalidate(story_id)
+
         return db_page
     
-    def save_asset(self, page_id: int, asset_type: AssetTypeEnum, file_path: str) -> AssetDB:
+    async def save_asset(self, page_id: int, asset_type: AssetTypeEnum, file_path: str,
+                   size_bytes: Optional[int] = None) -> AssetDB:
         """
         Save an asset (image or audio) to the database.
-        
+
         Args:
             page_id: Database ID of the page
             asset_type: Type of asset (IMAGE or AUDIO)
             file_path: Path to the asset file
-            
+            size_bytes: File size if the writer already knows it;
+                skips the filesystem lookup
+
         Returns:
             AssetDB: Created asset record
         """
-        size_bytes = None
-        if os.path.exists(file_path):
-            size_bytes = os.path.getsize(file_path)
-        
-        db_asset = AssetDB(
-            page_id=page_id,
-            asset_type=asset_type,
-            file_path=file_path,
-            size_bytes=size_bytes,
-            created_at=datetime.now()
-        )
-        
+        db_asset = self._build_asset(asset_type, file_path, size_bytes, datetime.now())
+        db_asset.page_id = page_id
+
         self.db.add(db_asset)
-        self.db.commit()
-        self.db.refresh(db_asset)
-        
+        await self.db.commit()
+
         return db_asset
     
-    def save_complete_story(self, story: Story) -> StoryDB:
+    async def save_complete_story(self, story: Story) -> StoryDB:
         """
         Save a complete story with all pages and assets.
         
@@ -123,16 +115,156 @@ class StoryRepository:
         Returns:
             StoryDB: Created story record
         """
-        # Create story record
-        db_story = self.create_story(story)
-        
-        # Save all pages
-        for page in story.pages:
-            self.save_page(story.story_id, page)
-        
+        # Bulk path: the story row goes through the ORM, but pages and
+        # assets are inserted with Core executemany, which skips the
+        # per-object unit-of-work bookkeeping. Everything still lands in
+        # a single transaction (one fsync).
+        # One timestamp for the whole save keeps every row consistent and
+        # avoids a clock read per page/asset.
+        now = datetime.now()
+        db_story = self._build_story(story, now)
+        self.db.add(db_story)
+        # The session has autoflush=False, so the story row must be
+        # flushed explicitly before the Core inserts reference its
+        # story_id (foreign_keys=ON would reject them otherwise)
+        await self.db.flush()
+
+        await self._insert_pages_bulk(story.story_id, story.pages, now)
+
+        await self.db.commit()
+        _cache_invalidate(story.story_id)
+
         return db_story
+
+    async def save_pages_bulk(self, story_id: str, pages: List[Page],
+                              status: Optional[StoryStatusEnum] = None) -> None:
+        """
+        Insert all pages (and their assets) for an existing story in one
+        transaction, optionally committing a status change alongside.
+
+        Args:
+            story_id: Story identifier
+            pages: Page dataclasses with asset paths/sizes filled in
+            status: Optional new story status saved in the same commit
+        """
+        now = datetime.now()
+
+        await self._insert_pages_bulk(story_id, pages, now)
+
+        db_story = await self._get_story_for_write(story_id)
+        if db_story:
+            db_story.total_pages = len(pages)
+            db_story.updated_at = now
+            if status is not None:
+                db_story.status = status
+
+        await self.db.commit()
+        _cache_invalidate(story_id)
+
+    async def _insert_pages_bulk(self, story_id: str, pages: List[Page],
+                                 now: datetime) -> None:
+        """Core-executemany insert of page and asset rows (no commit)."""
+        if not pages:
+            return
+
+        page_rows = [
+            {
+                "story_id": story_id,
+                "page_number": page.page_number,
+                "text": page.text,
+                "image_prompt": page.image_prompt,
+                "created_at": page.created_at or now,
+            }
+            for page in pages
+        ]
+        # RETURNING hands back the generated page ids in input order
+        page_ids = (await self.db.execute(
+            insert(PageDB).returning(PageDB.id, sort_by_parameter_order=True),
+            page_rows,
+        )).scalars().all()
+
+        asset_rows = []
+        for page_id, page in zip(page_ids, pages):
+            if page.image_path:
+                asset_rows.append(self._asset_values(
+                    page_id, AssetTypeEnum.IMAGE, page.image_path,
+                    page.image_size_bytes, now
+                ))
+            if page.audio_path:
+                asset_rows.append(self._asset_values(
+                    page_id, AssetTypeEnum.AUDIO, page.audio_path,
+                    page.audio_size_bytes, now
+                ))
+        if asset_rows:
+            await self.db.execute(insert(AssetDB), asset_rows)
+
+    @staticmethod
+    def _file_size(file_path: str, size_bytes: Optional[int]) -> Optional[int]:
+        """Resolve an asset's size, statting the file only when unknown."""
+        if size_bytes is None and os.path.exists(file_path):
+            size_bytes = os.path.getsize(file_path)
+        return size_bytes
+
+    def _asset_values(self, page_id: int, asset_type: AssetTypeEnum, file_path: str,
+                      size_bytes: Optional[int], now: datetime) -> dict:
+        """Build a Core insert parameter dict for an asset row."""
+        return {
+            "page_id": page_id,
+            "asset_type": asset_type,
+            "file_path": file_path,
+            "size_bytes": self._file_size(file_path, size_bytes),
+            "created_at": now,
+        }
+
+    def _build_story(self, story: Story, now: datetime) -> StoryDB:
+        """Build an unsaved StoryDB row from the dataclass."""
+        return StoryDB(
+            story_id=story.story_id,
+            title=story.title,
+            topic=story.topic,
+            age_group=story.age_group,
+            status=_STATUS_TO_DB.get(story.status, StoryStatusEnum.DRAFT),
+            total_pages=len(story.pages),
+            cache_key=story.cache_key,
+            cover_image_path=story.cover_image_path,
+            created_at=story.created_at or now,
+            updated_at=story.updated_at or now
+        )
+
+    def _build_page(self, story_id: str, page: Page, now: datetime) -> PageDB:
+        """Build an unsaved PageDB row (with its assets) from the dataclass."""
+        db_page = PageDB(
+            story_id=story_id,
+            page_number=page.page_number,
+            text=page.text,
+            image_prompt=page.image_prompt,
+            created_at=page.created_at or now
+        )
+
+        if page.image_path:
+            db_page.assets.append(
+                self._build_asset(AssetTypeEnum.IMAGE, page.image_path, page.image_size_bytes, now)
+            )
+        if page.audio_path:
+            db_page.assets.append(
+                self._build_asset(AssetTypeEnum.AUDIO, page.audio_path, page.audio_size_bytes, now)
+            )
+
+        return db_page
+
+    def _build_asset(self, asset_type: AssetTypeEnum, file_path: str,
+                     size_bytes: Optional[int], now: datetime) -> AssetDB:
+        """Build an unsaved AssetDB row for a file on disk."""
+        size_bytes = self._file_size(file_path, size_bytes)
+
+        return AssetDB(
+            asset_type=asset_type,
+            file_path=file_path,
+            size_bytes=size_bytes,
+            created_at=now
+        )
     
-    def get_story(self, story_id: str) -> Optional[StoryDB]:
+    async def get_story(self, story_id: str) -> Optional[StoryDB]:
         """
         Retrieve a story by its ID.
         
@@ -142,9 +274,36 @@ class StoryRepository:
         Returns:
             StoryDB or None
         """
-        return self.db.query(StoryDB).filter(StoryDB.story_id == story_id).first()
+        result = await self.read_db.execute(
+            select(StoryDB)
+            .options(selectinload(StoryDB.pages).selectinload(PageDB.assets))
+            .where(StoryDB.story_id == story_id)
+        )
+        return result.scalars().first()
+
+    async def find_story_by_cache_key(self, cache_key: str) -> Optional[StoryDB]:
+        """
+        Find the most recent completed story for a request cache key.
+
+        Args:
+            cache_key: SHA-256 of the normalized (topic, age) request
+
+        Returns:
+            StoryDB or None
+        """
+        result = await self.read_db.execute(
+            select(StoryDB)
+            .options(selectinload(StoryDB.pages).selectinload(PageDB.assets))
+            .where(
+                StoryDB.cache_key == cache_key,
+                StoryDB.status == StoryStatusEnum.COMPLETED,
+            )
+            .order_by(StoryDB.created_at.desc())
+            .limit(1)
+        )
+        return result.scalars().first()
     
-    def get_all_stories(self, limit: int = 100) -> List[StoryDB]:
+    async def get_all_stories(self, limit: int = 100) -> List[StoryDB]:
         """
         Retrieve all stories, most recent first.
         
@@ -154,14 +313,43 @@ class StoryRepository:
         Returns:
             List of StoryDB records
         """
-        return (
-            self.db.query(StoryDB)
+        result = await self.read_db.execute(
+            select(StoryDB)
+            .order_by(StoryDB.created_at.desc())
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def list_stories_summary(self, limit: int = 100):
+        """
+        Retrieve a lightweight story listing, most recent first.
+
+        Selects only the columns the list view displays, returning plain
+        row tuples instead of fully hydrated ORM objects.
+
+        Args:
+            limit: Maximum number of stories to return
+
+        Returns:
+            List of Row tuples (story_id, title, topic, age_group,
+            status, total_pages, created_at)
+        """
+        result = await self.read_db.execute(
+            select(
+                StoryDB.story_id,
+                StoryDB.title,
+                StoryDB.topic,
+                StoryDB.age_group,
+                StoryDB.status,
+                StoryDB.total_pages,
+                StoryDB.created_at,
+            )
             .order_by(StoryDB.created_at.desc())
             .limit(limit)
-            .all()
         )
+        return result.all()
     
-    def get_stories_by_status(self, status: StoryStatusEnum) -> List[StoryDB]:
+    async def get_stories_by_status(self, status: StoryStatusEnum) -> List[StoryDB]:
         """
         Retrieve stories by status.
         
@@ -171,14 +359,14 @@ class StoryRepository:
         Returns:
             List of StoryDB records
         """
-        return (
-            self.db.query(StoryDB)
-            .filter(StoryDB.status == status)
+        result = await self.read_db.execute(
+            select(StoryDB)
+            .where(StoryDB.status == status)
             .order_by(StoryDB.created_at.desc())
-            .all()
         )
+        return list(result.scalars().all())
     
-    def get_pages(self, story_id: str) -> List[PageDB]:
+    async def get_pages(self, story_id: str) -> List[PageDB]:
         """
         Retrieve all pages for a story.
         
@@ -188,14 +376,14 @@ class StoryRepository:
         Returns:
             List of PageDB records ordered by page number
         """
-        return (
-            self.db.query(PageDB)
-            .filter(PageDB.story_id == story_id)
+        result = await self.read_db.execute(
+            select(PageDB)
+            .where(PageDB.story_id == story_id)
             .order_by(PageDB.page_number)
-            .all()
         )
+        return list(result.scalars().all())
     
-    def update_story_status(self, story_id: str, status: StoryStatusEnum) -> bool:
+    async def update_story_status(self, story_id: str, status: StoryStatusEnum) -> bool:
         """
         Update the status of a story.
         
@@ -206,15 +394,16 @@ class StoryRepository:
         Returns:
             bool: True if successful
         """
-        db_story = self.get_story(story_id)
+        db_story = await self._get_story_for_write(story_id)
         if db_story:
             db_story.status = status
             db_story.updated_at = datetime.now()
-            self.db.commit()
+            await self.db.commit()
+            _cache_invalidate(story_id)
             return True
         return False
     
-    def delete_story(self, story_id: str) -> bool:
+    async def delete_story(self, story_id: str) -> bool:
         """
         Delete a story and all associated pages and assets.
         
@@ -224,12 +413,22 @@ class StoryRepository:
         Returns:
             bool: True if successful
         """
-        db_story = self.get_story(story_id)
+        db_story = await self._get_story_for_write(story_id)
         if db_story:
-            self.db.delete(db_story)
-            self.db.commit()
+            await self.db.delete(db_story)
+            await self.db.commit()
+            _cache_invalidate(story_id)
             return True
         return False
+
+    async def _get_story_for_write(self, story_id: str) -> Optional[StoryDB]:
+        """Load a story through the write session so it can be mutated."""
+        result = await self.db.execute(
+            select(StoryDB)
+            .options(selectinload(StoryDB.pages).selectinload(PageDB.assets))
+            .where(StoryDB.story_id == story_id)
+        )
+        return result.scalars().first()
     
     def story_to_dataclass(self, db_story: StoryDB) -> Story:
         """
@@ -241,29 +440,25 @@ class StoryRepository:
         Returns:
             Story dataclass instance
         """
-        # Map database enum to dataclass enum
-        status_map = {
-            StoryStatusEnum.DRAFT: StoryStatus.DRAFT,
-            StoryStatusEnum.GENERATING: StoryStatus.GENERATING,
-            StoryStatusEnum.COMPLETED: StoryStatus.COMPLETED,
-            StoryStatusEnum.FAILED: StoryStatus.FAILED,
-            StoryStatusEnum.ARCHIVED: StoryStatus.ARCHIVED,
-        }
-        
+        cached = _STORY_CACHE.get(db_story.story_id)
+        if cached is not None:
+            _STORY_CACHE.move_to_end(db_story.story_id)
+            return cached
+
         story = Story(
             title=db_story.title,
             topic=db_story.topic,
             age_group=db_story.age_group,
-            status=status_map.get(db_story.status, StoryStatus.DRAFT),
+            status=_STATUS_FROM_DB.get(db_story.status, StoryStatus.DRAFT),
             story_id=db_story.story_id,
             cover_image_path=db_story.cover_image_path,
             created_at=db_story.created_at,
             updated_at=db_story.updated_at
         )
         
-        # Load pages
-        db_pages = self.get_pages(db_story.story_id)
-        for db_page in db_pages:
+        # Pages (and their assets) are already eager-loaded by get_story,
+        # so this loop issues no further queries.
+        for db_page in db_story.pages:
             # Get assets for this page
             image_path = None
             audio_path = None
@@ -285,4 +480,9 @@ class StoryRepository:
             story.pages.append(page)
         
         story.total_pages = len(story.pages)
+
+        _STORY_CACHE[story.story_id] = story
+        if len(_STORY_CACHE) > _STORY_CACHE_MAXSIZE:
+            _STORY_CACHE.popitem(last=False)
+
         return story
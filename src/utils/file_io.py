@@ -1,19 +1,53 @@
+import asyncio
 import wave
 import os
 
 def save_wave_file(filename, pcm, channels=1, rate=24000, sample_width=2):
-    """Saves PCM data to a WAV file."""
+    """Saves PCM data to a WAV file. Returns the bytes written."""
     # Ensure directory exists
     os.makedirs(os.path.dirname(filename), exist_ok=True)
-    
-    with wave.open(filename, "wb") as wf:
-        wf.setnchannels(channels)
-        wf.setsampwidth(sample_width)
-        wf.setframerate(rate)
-        wf.writeframes(pcm)
+
+    with open(filename, "wb") as f:
+        with wave.open(f, "wb") as wf:
+            wf.setnchannels(channels)
+            wf.setsampwidth(sample_width)
+            wf.setframerate(rate)
+            wf.writeframes(pcm)
+        # fstat on the open fd — no extra path lookup for the caller
+        size = os.fstat(f.fileno()).st_size
+    return size
+
+def save_bytes(data, filename):
+    """Saves already-encoded bytes to a file. Returns the bytes written."""
+    # Ensure directory exists
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+    with open(filename, "wb") as f:
+        f.write(data)
+    return len(data)
 
 def save_image(image, filename):
-    """Saves a PIL Image to a file."""
+    """Saves a PIL Image to a file. Returns the bytes written."""
     # Ensure directory exists
     os.makedirs(os.path.dirname(filename), exist_ok=True)
-    image.save(filename)
+
+    # Write through our own file object so PIL doesn't reopen the path
+    # and we can read the size off the open fd
+    fmt = os.path.splitext(filename)[1].lstrip(".").upper() or "PNG"
+    if fmt == "JPG":
+        fmt = "JPEG"
+    with open(filename, "wb") as f:
+        image.save(f, format=fmt)
+        size = os.fstat(f.fileno()).st_size
+    return size
+
+async def asave_wave_file(filename, pcm, channels=1, rate=24000, sample_width=2):
+    """Async variant: runs the blocking WAV write in a worker thread so a
+    multi-MB audio write never stalls the event loop. Returns the bytes
+    written."""
+    return await asyncio.to_thread(save_wave_file, filename, pcm, channels, rate, sample_width)
+
+async def asave_image(image, filename):
+    """Async variant: runs the blocking PIL save in a worker thread.
+    Returns the bytes written."""
+    return await asyncio.to_thread(save_image, image, filename)
@@ -0,0 +1,59 @@
+"""
+Disk-backed cache for LLM outputs.
+Identical prompts against the same model return the stored response
+instead of paying for another network + inference round-trip.
+"""
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+# Cache lives next to the database under storage/
+CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    "storage", "llm_cache"
+)
+
+# Entries expire after a week so stale generations age out naturally
+DEFAULT_TTL_SECONDS = 7 * 86400
+
+class LLMCache:
+    """Exact-match prompt cache backed by JSON files on disk."""
+
+    def __init__(self, cache_dir: str = CACHE_DIR, ttl: int = DEFAULT_TTL_SECONDS):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(model_name: str, prompt: str) -> str:
+        """Derive a stable cache key from the model and full prompt text."""
+        return hashlib.sha256(f"{model_name}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached output for key, or None on miss/expiry."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        if time.time() - entry.get("created_at", 0) > self.ttl:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+        return entry.get("output")
+
+    def set(self, key: str, output: str):
+        """Store an LLM output under key."""
+        entry = {"created_at": time.time(), "output": output}
+        with open(self._path(key), "w", encoding="utf-8") as f:
+            json.dump(entry, f)
@@ -0,0 +1,37 @@
+"""
+Process-wide logging configuration.
+Routes records through a queue so handler I/O happens off the caller.
+"""
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+
+
+def setup_logging(level=logging.INFO):
+    """Install a queue-backed root logger.
+
+    Coroutines only enqueue the record (no formatting, no stdout
+    syscall); a background QueueListener thread does the actual
+    formatting and write, so logging never stalls the event loop.
+
+    The root stays at WARNING so third-party libraries (httpx logs
+    every request at INFO, google-genai announces its config) don't
+    flood the console; only the app's own "src" namespace gets the
+    requested level.
+    """
+    queue = SimpleQueue()
+
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter("%(message)s"))
+
+    listener = QueueListener(queue, console, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(logging.WARNING)
+    root.handlers.clear()
+    root.addHandler(QueueHandler(queue))
+    logging.getLogger("src").setLevel(level)
+    return listener
@@ -1,149 +1,340 @@
+from google import genai
+from google.genai import types
 from google.adk.runners import InMemoryRunner
 from src.agents.writer import WriterAgent
 from src.agents.illustrator import IllustratorAgent
 from src.agents.narrator import NarratorAgent
 from src.agents.editor import EditorAgent
 from src.models.story import Story, Page, StoryStatus
+from src.models.database import StoryStatusEnum
 from src.repositories.story_repository import StoryRepository
-from config.database import SessionLocal
+from src.utils.llm_cache import LLMCache
+from config.database import AsyncWriteSession
+from collections import OrderedDict
+from pathlib import Path
+import hashlib
+import logging
 import os
-import re
+import shutil
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Parsed structured-pages results kept per process; small, since each
+# entry is just a list of page dicts
+_PAGES_CACHE_MAXSIZE = 64
+
+# Dataclass status -> DB enum, built once instead of per run()
+_STATUS_MAP = {
+    StoryStatus.COMPLETED: StoryStatusEnum.COMPLETED,
+    StoryStatus.FAILED: StoryStatusEnum.FAILED,
+}
+
+def _hardlink(src: str, dst: str):
+    """Link dst to an already-generated src, copying when the
+    filesystem doesn't support hardlinks."""
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        pass
+    except OSError:
+        shutil.copyfile(src, dst)
+
+# Shared content-hash root: every generated file lives here once, named
+# by the sha1 of its bytes, and per-story directories only hold
+# hardlinks into it. Identical assets across stories share one inode.
+_CACHE_ROOT = Path("outputs") / "_cache"
+
+def _promote_to_cache(path: str):
+    """Move a generated file under the content-hash root, leaving the
+    per-story path as a hardlink to it.
+
+    os.link's atomic EEXIST is the coordination point between
+    concurrent runs: whoever links the cache name first wins, and
+    later producers of identical bytes re-point their story entry at
+    the cached inode.
+
+    Promotion is strictly best-effort: on filesystems without hardlink
+    support (or a cache root on another device) the story just keeps
+    its own copy and the cache is skipped.
+    """
+    try:
+        with open(path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        cache_path = _CACHE_ROOT / f"{digest}{Path(path).suffix}"
+        os.makedirs(_CACHE_ROOT, exist_ok=True)
+        try:
+            os.link(path, cache_path)
+        except FileExistsError:
+            # Identical bytes already cached by another run; swap this
+            # story's copy for a link to the shared inode. Link to a
+            # temp name first so the page's file is never gone if the
+            # link fails.
+            tmp = f"{path}.cachelink"
+            os.link(cache_path, tmp)
+            try:
+                os.replace(tmp, path)
+            except OSError:
+                os.remove(tmp)
+                raise
+    except OSError as exc:
+        logger.debug("Asset cache promotion skipped for %s: %s", path, exc)
+
+def _story_cache_key(topic: str, age: float) -> str:
+    """Request-level cache key: same normalized topic and rounded age
+    map to the same completed story."""
+    return hashlib.sha256(f"{topic.lower().strip()}|{round(age)}".encode("utf-8")).hexdigest()
 
 class StoryFlow:
-    def __init__(self, api_key, use_db: bool = True):
+    def __init__(self, api_key, use_db: bool = True, max_concurrent_pages: int = 4):
         self.api_key = api_key
+        # One genai client for the whole flow so the illustrator and
+        # narrator share a connection pool (TLS handshakes amortized,
+        # keep-alive reused across concurrent calls)
+        self.client = genai.Client(api_key=api_key)
         self.writer = WriterAgent()
         self.editor = EditorAgent()
-        self.illustrator = IllustratorAgent(api_key)
-        self.narrator = NarratorAgent(api_key)
+        self.illustrator = IllustratorAgent(self.client)
+        self.narrator = NarratorAgent(self.client)
         self.use_db = use_db
+        self.llm_cache = LLMCache()
+        # Runners are built once here; ADK session/service wiring isn't
+        # free, so repeated run() calls shouldn't pay it again
+        self._writer_runner = InMemoryRunner(agent=self.writer.agent)
+        self._editor_runner = InMemoryRunner(agent=self.editor.agent)
+        # Caps how many pages generate assets at once so the Gemini API
+        # isn't flooded, while still overlapping the I/O waits
+        self._page_sem = asyncio.Semaphore(max_concurrent_pages)
+        # Content-hash dedup caches, reset per run(): identical prompts
+        # or narration text within a story map to the generation task
+        # that produces the file, so duplicates hardlink instead of
+        # paying a second API call
+        self._img_cache = {}
+        self._aud_cache = {}
+        # LRU of parsed pages_data keyed on (age, story_text); a hit
+        # skips the editor call, prompt build and JSON parse outright
+        self._pages_cache = OrderedDict()
+
+    async def _run_collect(self, runner: InMemoryRunner, prompt: str) -> str:
+        """Stream a runner's events and join their text parts.
+
+        run_debug materializes every event before returning, so the
+        whole transcript sat in memory before extraction began. Async
+        iteration over run_async handles each event as the model
+        produces it; the list-append/join keeps accumulation linear.
+        """
+        session = await runner.session_service.create_session(
+            app_name=runner.app_name, user_id="story_flow")
+        message = types.Content(role="user", parts=[types.Part(text=prompt)])
+
+        chunks = []
+        append = chunks.append
+        async for event in runner.run_async(user_id="story_flow",
+                                            session_id=session.id,
+                                            new_message=message):
+            # getattr with a default replaces the hasattr probes (each
+            # an internal try/except) with one attribute lookup per level
+            content = getattr(event, 'content', None)
+            parts = getattr(content, 'parts', None) if content else None
+            if not parts:
+                continue
+            for part in parts:
+                text = getattr(part, 'text', None)
+                if text:
+                    append(text)
+        return "".join(chunks)
+
+    async def warmup(self):
+        """Open the shared client's HTTPS connection ahead of use.
+
+        The first Gemini call otherwise pays DNS + TCP + TLS setup on
+        the critical path; a cheap models.list here does that handshake
+        up front so page generation starts on a warm keep-alive
+        connection.
+        """
+        try:
+            await asyncio.to_thread(
+                lambda: next(iter(self.client.models.list()), None))
+        except Exception as e:
+            logger.debug("Client warm-up skipped: %s", e)
+
+    async def _generate_once(self, cache: dict, key: str, generate, text: str,
+                             output_path: str):
+        """Run a generator unless an identical input already has a task.
 
-    async def _generate_page_assets(self, page: Page, story_id: str) -> Page:
+        On a duplicate, await the original task and hardlink its output
+        file to this page's path instead of calling the API again.
+        """
+        task = cache.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._generate_and_cache(generate, text, output_path))
+            cache[key] = task
+            return await task
+        existing_path, size_bytes = await task
+        if existing_path is None:
+            return None, None
+        if existing_path != output_path:
+            await asyncio.to_thread(_hardlink, existing_path, output_path)
+        return output_path, size_bytes
+
+    @staticmethod
+    async def _generate_and_cache(generate, text: str, output_path: str):
+        """Generate an asset, then file it under the shared cache root."""
+        path, size_bytes = await generate(text, output_path)
+        if path is not None:
+            await asyncio.to_thread(_promote_to_cache, path)
+        return path, size_bytes
+
+    async def _generate_page_assets(self, page: Page, story_dir: Path) -> Page:
         """Generate both image and audio for a single page in parallel."""
-        print(f"  Processing page {page.page_number}...")
-        
-        # Use ThreadPoolExecutor to run sync operations in parallel
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            # Generate Image
-            image_path = os.path.join("outputs", story_id, f"page_{page.page_number}.png")
-            
-            # Generate Audio
-            audio_path = os.path.join("outputs", story_id, f"page_{page.page_number}.wav")
-            
-            # Run both operations in parallel
-            loop = asyncio.get_event_loop()
-            image_future = loop.run_in_executor(
-                executor,
-                self.illustrator.generate_image,
-                page.image_prompt or f"Children's book illustration: {page.text[:200]}",
-                image_path
-            )
-            audio_future = loop.run_in_executor(
-                executor,
-                self.narrator.generate_audio,
-                page.text,
-                audio_path
+        async with self._page_sem:
+            logger.info("  Processing page %s...", page.page_number)
+
+            image_path = str(story_dir / f"page_{page.page_number}.png")
+            audio_path = str(story_dir / f"page_{page.page_number}.wav")
+
+            # Explicit branch so the fallback slice is only built when
+            # the editor didn't supply a prompt
+            if page.image_prompt:
+                image_prompt = page.image_prompt
+            else:
+                image_prompt = f"Children's book illustration: {page.text[:200]}"
+
+            img_key = hashlib.sha1(image_prompt.encode("utf-8")).hexdigest()
+            aud_key = hashlib.sha1(page.text.encode("utf-8")).hexdigest()
+
+            # Run both blocking Gemini calls concurrently in worker threads
+            (page.image_path, page.image_size_bytes), (page.audio_path, page.audio_size_bytes) = await asyncio.gather(
+                self._generate_once(self._img_cache, img_key,
+                                    self.illustrator.agenerate_image,
+                                    image_prompt, image_path),
+                self._generate_once(self._aud_cache, aud_key,
+                                    self.narrator.agenerate_audio,
+                                    page.text, audio_path)
             )
-            
-            # Wait for both to complete
-            page.image_path, page.audio_path = await asyncio.gather(image_future, audio_future)
-        
-        return page
+
+            return page
 
     async def run(self, topic: str, age: float) -> Story:
-        print(f"Starting story generation for topic: {topic}, age: {age}")
-        print("="*60)
+        logger.info("Starting story generation for topic: %s, age: %s", topic, age)
+        logger.info("=" * 60)
         
+        cache_key = _story_cache_key(topic, age)
+        self._img_cache = {}
+        self._aud_cache = {}
+
         # Create Story Object early for tracking
         story = Story(title=f"A Story about {topic}", topic=topic, age_group=age)
         story.status = StoryStatus.GENERATING
-        
-        # Save initial story to database if enabled
-        db_session = None
+        story.cache_key = cache_key
+
+        # Save initial story to database if enabled. Sessions are scoped
+        # to each DB phase rather than held open for the whole run —
+        # story generation takes minutes, and a long-lived session would
+        # pin the single write connection idle through every LLM wait.
         if self.use_db:
-            db_session = SessionLocal()
-            repo = StoryRepository(db_session)
             try:
-                repo.create_story(story)
-                print(f"✓ Story '{story.story_id}' created in database")
+                async with AsyncWriteSession() as db:
+                    repo = StoryRepository(db)
+                    # A completed story for the same topic/age can be reused
+                    # outright, skipping all LLM, image and TTS calls
+                    cached_db_story = await repo.find_story_by_cache_key(cache_key)
+                    if cached_db_story:
+                        logger.info("✓ Reusing completed story '%s' for this topic/age.", cached_db_story.story_id)
+                        return repo.story_to_dataclass(cached_db_story)
+            except Exception as e:
+                logger.warning("⚠ Database error: %s", e)
+
+            try:
+                async with AsyncWriteSession() as db:
+                    await StoryRepository(db).create_story(story)
+                logger.info("✓ Story '%s' created in database", story.story_id)
             except Exception as e:
-                print(f"⚠ Database error: {e}")
+                logger.warning("⚠ Database error: %s", e)
         
         try:
             # 1. Generate Story Text
-            print("\n[Phase 1/4] Generating story text...")
+            logger.info("\n[Phase 1/4] Generating story text...")
             # Generate story text
             prompt = f"Write a short story for a {age} year old child about {topic}."
-            runner = InMemoryRunner(agent=self.writer.agent)
-            events = await runner.run_debug(user_messages=prompt)
-            
-            # Extract the story text from events
-            story_text = ""
-            for event in events:
-                if hasattr(event, 'content') and event.content and hasattr(event.content, 'parts') and event.content.parts:
-                    for part in event.content.parts:
-                        if hasattr(part, 'text') and part.text:
-                            story_text += part.text
-            
-            if not story_text:
-                raise ValueError("Failed to generate story text.")
+            writer_key = LLMCache.make_key(self.writer.model_name, prompt)
+            story_text = await asyncio.to_thread(self.llm_cache.get, writer_key)
+
+            if story_text:
+                logger.info("✓ Story text served from cache.")
+            else:
+                story_text = await self._run_collect(self._writer_runner, prompt)
+
+                if not story_text:
+                    raise ValueError("Failed to generate story text.")
 
-            print("✓ Story text generated successfully.")
+                await asyncio.to_thread(self.llm_cache.set, writer_key, story_text)
+                logger.info("✓ Story text generated successfully.")
             
             # 2. Structure story into pages using EditorAgent
-            print("\n[Phase 2/4] Structuring story into pages...")
-            editor_runner = InMemoryRunner(agent=self.editor.agent)
-            # Create a detailed prompt that includes the story and age information
-            editor_prompt = f"""Please structure this story into 4-8 pages for a {age} year old child.
-
-Story:
-{story_text}
-
-Output Format (JSON):
-{{
-  "pages": [
-    {{
-      "page_number": 1,
-      "text": "Page text here...",
-      "illustration_prompt": "A detailed description for the illustrator..."
-    }}
-  ]
-}}
-
-CRITICAL: Output ONLY valid JSON, no other text or explanation."""
-            editor_events = await editor_runner.run_debug(user_messages=editor_prompt)
-            
-            # Extract editor response
-            editor_text = ""
-            for event in editor_events:
-                if hasattr(event, 'content') and event.content and hasattr(event.content, 'parts') and event.content.parts:
-                    for part in event.content.parts:
-                        if hasattr(part, 'text') and part.text:
-                            editor_text += part.text
-            
-            if not editor_text:
-                raise ValueError("No editor output generated")
-            
-            pages_data = self.editor.parse_structured_pages(editor_text)
-            
-            if not pages_data:
-                print("⚠ Editor agent failed to structure pages. Falling back to simple split.")
-                # Fallback to simple splitting
-                paragraphs = [p.strip() for p in story_text.split('\n\n') if p.strip()]
-                pages_data = [
-                    {
-                        "page_number": i + 1,
-                        "text": p,
-                        "illustration_prompt": f"Children's book illustration: {p[:200]}"
-                    }
-                    for i, p in enumerate(paragraphs)
-                ]
-            
-            print(f"✓ Story structured into {len(pages_data)} pages.")
-            
-            # 3. Add pages to story
+            logger.info("\n[Phase 2/4] Structuring story into pages...")
+            # A previously parsed result for this exact story/age skips
+            # the editor call, prompt build and JSON parse entirely
+            struct_key = hashlib.sha256(f"{age}|{story_text}".encode("utf-8")).hexdigest()
+            pages_data = self._pages_cache.get(struct_key)
+
+            if pages_data is not None:
+                self._pages_cache.move_to_end(struct_key)
+                logger.info("✓ Structured pages served from cache.")
+            else:
+                # Static instructions first, story last, so the provider can
+                # cache the instruction prefix across stories
+                editor_prompt = self.editor.build_prompt(story_text, age)
+                editor_key = LLMCache.make_key(self.editor.model_name, editor_prompt)
+                editor_text = await asyncio.to_thread(self.llm_cache.get, editor_key)
+
+                if not editor_text:
+                    editor_text = await self._run_collect(self._editor_runner, editor_prompt)
+
+                    if not editor_text:
+                        raise ValueError("No editor output generated")
+
+                    await asyncio.to_thread(self.llm_cache.set, editor_key, editor_text)
+
+                pages_data = self.editor.parse_structured_pages(editor_text)
+
+                if not pages_data:
+                    logger.warning("⚠ Editor agent failed to structure pages. Falling back to simple split.")
+                    # Fallback to simple splitting
+                    paragraphs = [p.strip() for p in story_text.split('\n\n') if p.strip()]
+                    pages_data = [
+                        {
+                            "page_number": i + 1,
+                            "text": p,
+                            "illustration_prompt": f"Children's book illustration: {p[:200]}"
+                        }
+                        for i, p in enumerate(paragraphs)
+                    ]
+
+                self._pages_cache[struct_key] = pages_data
+                if len(self._pages_cache) > _PAGES_CACHE_MAXSIZE:
+                    self._pages_cache.popitem(last=False)
+
+            logger.info("✓ Story structured into %s pages.", len(pages_data))
+
+            # 3+4. Build pages and generate assets, pipelined
+            logger.info("\n[Phase 3/4] Generating assets for %s pages...", len(pages_data))
+            logger.info("(Images and audio are generated in parallel for each page)")
+
+            # Create output directory; the Path is built once and reused
+            # for every page's asset files
+            story_dir = Path("outputs") / story.story_id
+            # Directory creation is a blocking syscall; keep it off the loop
+            await asyncio.to_thread(os.makedirs, story_dir, exist_ok=True)
+
+            # Dispatch each page's asset generation the moment its Page
+            # object exists instead of waiting for the full list — the
+            # semaphore in _generate_page_assets bounds how many are in
+            # flight at once to stay under API rate limits. (The ADK
+            # debug runner buffers the whole editor response, so this is
+            # the earliest point a page can start.)
+            tasks = []
             for page_data in pages_data:
                 page = Page(
                     page_number=page_data["page_number"],
@@ -151,62 +342,45 @@ CRITICAL: Output ONLY valid JSON, no other text or explanation."""
                     image_prompt=page_data.get("illustration_prompt", "")
                 )
                 story.pages.append(page)
-            
+                tasks.append(asyncio.create_task(self._generate_page_assets(page, story_dir)))
+
             story.total_pages = len(story.pages)
-            
-            # 4. Generate Assets for all pages in parallel
-            print(f"\n[Phase 3/4] Generating assets for {len(story.pages)} pages...")
-            print("(Images and audio are generated in parallel for each page)")
-            
-            # Create output directory
-            story_id = story.story_id
-            os.makedirs(os.path.join("outputs", story_id), exist_ok=True)
-            
-            # Process all pages - each page's image+audio generated in parallel
-            # Pages are processed sequentially to avoid API rate limits
-            for page in story.pages:
-                await self._generate_page_assets(page, story_id)
-                
-                # Save page to database after assets are generated
-                if self.use_db and db_session:
-                    try:
-                        repo.save_page(story.story_id, page)
-                    except Exception as e:
-                        print(f"⚠ Error saving page {page.page_number}: {e}")
-                
-            print(f"✓ All assets generated successfully.")
-            
+
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for page, result in zip(story.pages, results):
+                if isinstance(result, BaseException):
+                    raise result
+
+            logger.info("✓ All assets generated successfully.")
+
             # Mark story as completed
             story.mark_completed()
-            
-            # Update story status in database
-            if self.use_db and db_session:
+
+            # Persist all pages, their assets and the final status in one
+            # transaction — one fsync for the whole story instead of one
+            # commit per page
+            if self.use_db:
                 try:
-                    from src.models.database import StoryStatusEnum
-                    status_map = {
-                        StoryStatus.COMPLETED: StoryStatusEnum.COMPLETED,
-                        StoryStatus.FAILED: StoryStatusEnum.FAILED,
-                    }
-                    db_status = status_map.get(story.status, StoryStatusEnum.COMPLETED)
-                    repo.update_story_status(story.story_id, db_status)
-                    print(f"✓ Story status updated to: {story.status.value}")
+                    db_status = _STATUS_MAP.get(story.status, StoryStatusEnum.COMPLETED)
+                    async with AsyncWriteSession() as db:
+                        await StoryRepository(db).save_pages_bulk(
+                            story.story_id, story.pages, status=db_status)
+                    logger.info("✓ Story saved, status updated to: %s", story.status.value)
                 except Exception as e:
-                    print(f"⚠ Error updating story status: {e}")
-            
-            print("\n[Phase 4/4] Story generation complete!")
-            print("="*60)
+                    logger.warning("⚠ Error saving story to database: %s", e)
+
+            logger.info("\n[Phase 4/4] Story generation complete!")
+            logger.info("=" * 60)
             return story
-            
+
         except Exception as e:
             # Mark story as failed
             story.mark_failed()
-            if self.use_db and db_session:
+            if self.use_db:
                 try:
-                    from src.models.database import StoryStatusEnum
-                    repo.update_story_status(story.story_id, StoryStatusEnum.FAILED)
+                    async with AsyncWriteSession() as db:
+                        await StoryRepository(db).update_story_status(
+                            story.story_id, StoryStatusEnum.FAILED)
                 except:
                     pass
             raise e
-        finally:
-            if db_session:
-                db_session.close()